@@ -17,21 +17,57 @@
 
 from __future__ import absolute_import
 
+import collections
 import os
 import inspect
-import posixpath
+import re
 
+from concurrent import futures
 from os.path import join as pjoin
 from six.moves.urllib.parse import urlparse
 
 import pyarrow as pa
 from pyarrow.util import implements, _stringify_path, _is_path_like
 
+try:
+    # os.scandir might not be available
+    try:
+        from os import scandir as _scandir
+    except ImportError:
+        from scandir import scandir as _scandir  # python 2 backport
+except ImportError:
+    _scandir = None
+
+try:
+    from time import monotonic as _monotonic
+except ImportError:
+    from time import time as _monotonic  # python 2
+
+# FileSystem.stat_many stats paths from a thread pool of this size when
+# there are more than _STAT_MANY_SERIAL_THRESHOLD of them, see
+# _map_concurrently
+_STAT_MANY_NTHREADS = 32
+_STAT_MANY_SERIAL_THRESHOLD = 4
+
+# Number of threads listing directories in LocalFileSystem.walk(parallel=True)
+_LOCAL_WALK_NTHREADS = 8
+
+# Number of paths FileSystem.disk_usage passes to each stat_many call
+_DISK_USAGE_CHUNK_SIZE = 256
+
+# Listings of S3 prefixes are reused by S3FSWrapper for this many seconds
+_S3_LISTING_TTL = 5.0
+_S3_LISTING_CACHE_SIZE = 4096
+
 
 class FileSystem(object):
     """
     Abstract filesystem interface
     """
+    __slots__ = ()
+
+    pathsep = '/'
+
     def cat(self, path):
         """
         Return contents of file as a bytes object
@@ -79,13 +115,46 @@ class FileSystem(object):
         if path_info['kind'] == 'file':
             return path_info['size']
 
-        total = 0
-        for root, directories, files in self.walk(path):
-            for child_path in files:
-                abspath = self._path_join(root, child_path)
-                total += self.stat(abspath)['size']
+        return sum(size for _, size, kind in self.walk_stat(path)
+                   if kind == 'file')
 
-        return total
+    def walk_stat(self, path):
+        """
+        Generator yielding a (path, size, kind) tuple for every file and
+        directory under path, kind being 'file' or 'directory'. The size of
+        directories is reported as 0. Unless overridden, the files found by
+        walk are passed to stat_many in chunks
+
+        Parameters
+        ----------
+        path : string
+            Root directory for tree traversal
+        """
+        # Joining by concatenation is cheaper than a _path_join call, which
+        # matters since this runs once per file
+        sep = self.pathsep
+        paths = []
+        # One pool serves every chunk; its threads are only started once a
+        # chunk is large enough to be stat'ed concurrently
+        executor = futures.ThreadPoolExecutor(max_workers=_STAT_MANY_NTHREADS)
+        try:
+            for root, directories, files in self.walk(path):
+                prefix = root + sep
+                for child_path in directories:
+                    yield prefix + child_path, 0, 'directory'
+                for child_path in files:
+                    paths.append(prefix + child_path)
+                    if len(paths) == _DISK_USAGE_CHUNK_SIZE:
+                        infos = self.stat_many(paths, executor=executor)
+                        for abspath, info in zip(paths, infos):
+                            yield abspath, info['size'], 'file'
+                        paths = []
+
+            infos = self.stat_many(paths, executor=executor)
+            for abspath, info in zip(paths, infos):
+                yield abspath, info['size'], 'file'
+        finally:
+            executor.shutdown(wait=False)
 
     def _path_join(self, *args):
         return self.pathsep.join(args)
@@ -99,6 +168,25 @@ class FileSystem(object):
         """
         raise NotImplementedError('FileSystem.stat')
 
+    def stat_many(self, paths, executor=None):
+        """
+        Return stat information for several paths at once. Unless overridden,
+        stat is called for each path, concurrently if there are more than a
+        few of them
+
+        Parameters
+        ----------
+        paths : list of strings
+        executor : concurrent.futures.Executor, optional
+            Pool to make concurrent calls from. By default a thread pool is
+            created for the call
+
+        Returns
+        -------
+        stats : list of dicts, in the order of paths
+        """
+        return _map_concurrently(self.stat, paths, executor=executor)
+
     def rm(self, path, recursive=False):
         """
         Alias for FileSystem.delete
@@ -188,29 +276,42 @@ class FileSystem(object):
         """
         raise NotImplementedError
 
-    @property
-    def pathsep(self):
-        return '/'
-
 
 class LocalFileSystem(FileSystem):
 
-    _instance = None
+    __slots__ = ()
+
+    pathsep = os.path.sep
+
+    @staticmethod
+    def get_instance():
+        return _LOCAL_FS
 
-    @classmethod
-    def get_instance(cls):
-        if cls._instance is None:
-            cls._instance = LocalFileSystem()
-        return cls._instance
+    # The methods below are called once per file during dataset discovery
+    # and almost always with str paths, for which _stringify_path is skipped
 
     @implements(FileSystem.ls)
     def ls(self, path):
-        path = _stringify_path(path)
-        return sorted(pjoin(path, x) for x in os.listdir(path))
+        if type(path) is not str:
+            path = _stringify_path(path)
+
+        if _scandir is None:
+            return sorted(pjoin(path, x) for x in os.listdir(path))
+
+        # DirEntry.path is already joined with the listed directory
+        entries = _scandir(path)
+        try:
+            paths = [entry.path for entry in entries]
+        finally:
+            if hasattr(entries, 'close'):
+                entries.close()
+        paths.sort()
+        return paths
 
     @implements(FileSystem.mkdir)
     def mkdir(self, path, create_parents=True):
-        path = _stringify_path(path)
+        if type(path) is not str:
+            path = _stringify_path(path)
         if create_parents:
             os.makedirs(path)
         else:
@@ -218,12 +319,14 @@ class LocalFileSystem(FileSystem):
 
     @implements(FileSystem.isdir)
     def isdir(self, path):
-        path = _stringify_path(path)
+        if type(path) is not str:
+            path = _stringify_path(path)
         return os.path.isdir(path)
 
     @implements(FileSystem.isfile)
     def isfile(self, path):
-        path = _stringify_path(path)
+        if type(path) is not str:
+            path = _stringify_path(path)
         return os.path.isfile(path)
 
     @implements(FileSystem._isfilestore)
@@ -232,7 +335,8 @@ class LocalFileSystem(FileSystem):
 
     @implements(FileSystem.exists)
     def exists(self, path):
-        path = _stringify_path(path)
+        if type(path) is not str:
+            path = _stringify_path(path)
         return os.path.exists(path)
 
     @implements(FileSystem.open)
@@ -240,29 +344,153 @@ class LocalFileSystem(FileSystem):
         """
         Open file for reading or writing
         """
-        path = _stringify_path(path)
+        if type(path) is not str:
+            path = _stringify_path(path)
         return open(path, mode=mode)
 
-    @property
-    def pathsep(self):
-        return os.path.sep
-
-    def walk(self, path):
+    @implements(FileSystem.disk_usage)
+    def disk_usage(self, path):
+        if type(path) is not str:
+            path = _stringify_path(path)
+        if not os.path.isdir(path):
+            return os.stat(path).st_size
+
+        return sum(size for _, size, kind in self.walk_stat(path)
+                   if kind == 'file')
+
+    @implements(FileSystem.walk_stat)
+    def walk_stat(self, path):
+        if type(path) is not str:
+            path = _stringify_path(path)
+
+        if _scandir is None:
+            for root, directories, files in os.walk(path):
+                for child_path in directories:
+                    yield pjoin(root, child_path), 0, 'directory'
+                for child_path in files:
+                    abspath = pjoin(root, child_path)
+                    yield abspath, os.lstat(abspath).st_size, 'file'
+            return
+
+        # The DirEntry objects returned by scandir cache the file type, so
+        # telling files from directories needs no extra stat call. Their stat
+        # result is only cached on Windows, elsewhere entry.stat() is a lstat
+        # call. Like os.walk, symlinks to directories are not followed,
+        # subdirectories which cannot be listed are skipped and entries whose
+        # type cannot be determined are treated as files
+        pending = [path]
+        while pending:
+            directory = pending.pop()
+            try:
+                entries = _scandir(directory)
+            except OSError:
+                if directory is path:
+                    raise
+                continue
+            try:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        if not entry.is_symlink():
+                            pending.append(entry.path)
+                        yield entry.path, 0, 'directory'
+                    else:
+                        size = entry.stat(follow_symlinks=False).st_size
+                        yield entry.path, size, 'file'
+            finally:
+                # ScandirIterator.close is only available from python 3.6
+                if hasattr(entries, 'close'):
+                    entries.close()
+
+    def walk(self, path, parallel=False):
         """
         Directory tree generator, see os.walk
-        """
-        path = _stringify_path(path)
+
+        Parameters
+        ----------
+        path : string
+            Root directory for tree traversal
+        parallel : boolean, default False
+            If True, list directories from a thread pool, which helps on
+            storage with high metadata latency or many directories. The tree
+            is then visited breadth-first, but as with os.walk the caller may
+            prune it through the yielded directories
+        """
+        if type(path) is not str:
+            path = _stringify_path(path)
+
+        if parallel and _scandir is not None:
+            def _list_directory(directory):
+                # Like os.walk, do not descend into symlinks to directories
+                # and skip directories which cannot be listed
+                if directory != path and os.path.islink(directory):
+                    return None
+                try:
+                    return _list_local_directory(directory)
+                except OSError:
+                    return None
+
+            return _walk_concurrently(path, _list_directory, pjoin,
+                                      _LOCAL_WALK_NTHREADS)
+
         return os.walk(path)
 
 
+_LOCAL_FS = LocalFileSystem()
+
+
+def _list_local_directory(path):
+    # Returns the (directories, files) names in path, classified like os.walk
+    # which lists symlinks to directories among directories
+    directories = []
+    files = []
+    entries = _scandir(path)
+    try:
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                directories.append(entry.name)
+            else:
+                files.append(entry.name)
+    finally:
+        if hasattr(entries, 'close'):
+            entries.close()
+    return directories, files
+
+
 class DaskFileSystem(FileSystem):
     """
     Wraps s3fs Dask filesystem implementation like s3fs, gcsfs, etc.
     """
+    __slots__ = ('fs',)
 
     def __init__(self, fs):
         self.fs = fs
 
+    def __getstate__(self):
+        # Needed to pickle with protocols < 2 due to __slots__. Collects the
+        # slots of every class in the hierarchy and the __dict__ of
+        # subclasses that have one
+        state = dict(getattr(self, '__dict__', {}))
+        for cls in type(self).__mro__:
+            slots = cls.__dict__.get('__slots__', ())
+            if isinstance(slots, str):
+                slots = (slots,)
+            for name in slots:
+                if name != '__dict__' and hasattr(self, name):
+                    state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
     @implements(FileSystem.isdir)
     def isdir(self, path):
         raise NotImplementedError("Unsupported file system API")
@@ -319,15 +547,115 @@ class DaskFileSystem(FileSystem):
 
 class S3FSWrapper(DaskFileSystem):
 
+    __slots__ = ('_listing_cache',)
+
+    def __init__(self, fs):
+        super(S3FSWrapper, self).__init__(fs)
+        # Maps prefix -> (timestamp, listing, listing by key), see
+        # _cached_listing. Not pickled, timestamps are only meaningful within
+        # one process
+        self._listing_cache = {}
+
+    def __getstate__(self):
+        state = super(S3FSWrapper, self).__getstate__()
+        del state['_listing_cache']
+        return state
+
+    def __setstate__(self, state):
+        super(S3FSWrapper, self).__setstate__(state)
+        self._listing_cache = {}
+
+    def _cached_listing(self, path, refresh=False):
+        """
+        Return the raw s3fs listing of a prefix along with a dict indexing it
+        by key. Listings retrieved less than _S3_LISTING_TTL seconds ago are
+        reused so that repeated isdir / isfile / stat / walk calls during a
+        scan hit memory
+
+        Parameters
+        ----------
+        path : string
+            Sanitized S3 prefix, without the s3:// scheme
+        refresh : boolean, default False
+            If True, always request a fresh listing
+        """
+        now = _monotonic()
+        if not refresh:
+            cached = self._listing_cache.get(path)
+            if cached is not None and now - cached[0] < _S3_LISTING_TTL:
+                return cached[1], cached[2]
+
+        contents = list(self.fs._ls(path, refresh=refresh))
+        keys = {}
+        for key in contents:
+            # s3fs creates duplicate 'DIRECTORY' entries, those take
+            # precedence
+            if key['StorageClass'] == 'DIRECTORY' or key['Key'] not in keys:
+                keys[key['Key']] = key
+
+        if len(self._listing_cache) >= _S3_LISTING_CACHE_SIZE:
+            self._listing_cache.clear()
+        self._listing_cache[path] = (now, contents, keys)
+        return contents, keys
+
+    def _cached_ls(self, path, refresh=False):
+        return self._cached_listing(path, refresh=refresh)[0]
+
+    def _cached_ls_keys(self, path, refresh=False):
+        return self._cached_listing(path, refresh=refresh)[1]
+
+    def _invalidate_listings(self, path):
+        """
+        Drop the cached listings affected by a modification of path, i.e.
+        those of path itself, its descendants and its ancestors
+        """
+        path = _sanitize_s3(_stringify_path(path)).rstrip('/')
+        for cached_path in list(self._listing_cache):
+            if (cached_path == path or
+                    cached_path.startswith(path + '/') or
+                    path.startswith(cached_path + '/') or
+                    cached_path == ''):
+                self._listing_cache.pop(cached_path, None)
+
+    def _key_is_file(self, path):
+        # S3 has no notion of a file, a key is treated as one when it appears
+        # as an object in the listing of its parent prefix. That listing is
+        # shared by all keys under the same prefix, and prefixes which also
+        # have children are indexed as 'DIRECTORY'. A key missing from it is
+        # not a file either, whatever listing it as a prefix returns
+        key = self._cached_ls_keys(path.rpartition('/')[0]).get(path)
+        return (key is not None and
+                key['StorageClass'] not in ('DIRECTORY', 'BUCKET'))
+
+    @implements(FileSystem.stat)
+    def stat(self, path):
+        return self.stat_many([path])[0]
+
+    @implements(FileSystem.stat_many)
+    def stat_many(self, paths, executor=None):
+        paths = [_sanitize_s3(_stringify_path(path)).rstrip('/')
+                 for path in paths]
+
+        # Sizes are part of the listing of the parent prefix, which walk has
+        # usually cached already, so no HEAD request is needed per key.
+        # Buckets are not looked up in the bucket list of the account, which
+        # is empty for anonymous access or without s3:ListAllMyBuckets
+        parents = list(set(path.rpartition('/')[0] for path in paths
+                           if '/' in path))
+        listings = dict(zip(parents,
+                            _map_concurrently(self._cached_ls_keys, parents,
+                                              executor=executor)))
+
+        return [_s3_key_stat(path,
+                             listings[path.rpartition('/')[0]].get(path))
+                if '/' in path else {'size': 0, 'kind': 'directory'}
+                for path in paths]
+
     @implements(FileSystem.isdir)
     def isdir(self, path):
         path = _sanitize_s3(_stringify_path(path))
         try:
-            contents = self.fs.ls(path)
-            if len(contents) == 1 and contents[0] == path:
-                return False
-            else:
-                return True
+            return not self._key_is_file(path)
         except OSError:
             return False
 
@@ -335,42 +663,214 @@ class S3FSWrapper(DaskFileSystem):
     def isfile(self, path):
         path = _sanitize_s3(_stringify_path(path))
         try:
-            contents = self.fs.ls(path)
-            return len(contents) == 1 and contents[0] == path
+            return self._key_is_file(path)
         except OSError:
             return False
 
-    def walk(self, path, refresh=False):
+    @implements(FileSystem.delete)
+    def delete(self, path, recursive=False):
+        self._invalidate_listings(path)
+        return super(S3FSWrapper, self).delete(path, recursive=recursive)
+
+    @implements(FileSystem.mkdir)
+    def mkdir(self, path, create_parents=True):
+        self._invalidate_listings(path)
+        return super(S3FSWrapper, self).mkdir(path,
+                                              create_parents=create_parents)
+
+    @implements(FileSystem.open)
+    def open(self, path, mode='rb'):
+        """
+        Open file for reading or writing
+        """
+        if not any(c in mode for c in 'wax+'):
+            return super(S3FSWrapper, self).open(path, mode=mode)
+
+        # The object only appears on S3 once the file is closed, so listings
+        # cached while it is being written are dropped again at that point
+        self._invalidate_listings(path)
+        return _S3WriteFile(super(S3FSWrapper, self).open(path, mode=mode),
+                            lambda: self._invalidate_listings(path))
+
+    @implements(FileSystem.rename)
+    def rename(self, path, new_path):
+        self._invalidate_listings(path)
+        self._invalidate_listings(new_path)
+        path = _sanitize_s3(_stringify_path(path))
+        new_path = _sanitize_s3(_stringify_path(new_path))
+        return self.fs.mv(path, new_path)
+
+    def walk(self, path, refresh=False, nthreads=16):
         """
         Directory tree generator, like os.walk
 
         Generator version of what is in s3fs, which yields a flattened list of
-        files
-        """
-        path = _sanitize_s3(_stringify_path(path))
-        directories = set()
-        files = set()
-
-        for key in list(self.fs._ls(path, refresh=refresh)):
-            path = key['Key']
-            if key['StorageClass'] == 'DIRECTORY':
-                directories.add(path)
-            elif key['StorageClass'] == 'BUCKET':
-                pass
-            else:
-                files.add(path)
+        files. Directories are visited breadth-first and up to nthreads
+        listings are requested concurrently to hide the S3 request latency.
+        Removing names from the yielded directories prevents visiting them.
 
-        # s3fs creates duplicate 'DIRECTORY' entries
-        files = sorted([posixpath.split(f)[1] for f in files
-                        if f not in directories])
-        directories = sorted([posixpath.split(x)[1]
-                              for x in directories])
+        Parameters
+        ----------
+        path : string
+            Root prefix for tree traversal
+        refresh : boolean, default False
+            If True, bypass the listing caches of this wrapper and of s3fs
+        nthreads : int, default 16
+            Maximum number of listing requests in flight
+        """
+        return ((root, directories, files)
+                for root, directories, files, _ in
+                self._walk(path, refresh=refresh, nthreads=nthreads))
+
+    def _walk(self, path, refresh=False, nthreads=16):
+        # Like walk, but also yields a dict mapping file names to their size,
+        # taken from the same listing
+        path = _sanitize_s3(_stringify_path(path)).rstrip('/')
+
+        def _list_directory(directory):
+            contents = self._cached_ls(directory, refresh=refresh)
+            return _s3_walk_files_dirs(directory, contents)
+
+        return _walk_concurrently(path, _list_directory, self._path_join,
+                                  nthreads)
+
+    @implements(FileSystem.walk_stat)
+    def walk_stat(self, path, refresh=False):
+        for root, directories, files, sizes in self._walk(path,
+                                                          refresh=refresh):
+            prefix = root + self.pathsep
+            for child_path in directories:
+                yield prefix + child_path, 0, 'directory'
+            for child_path in files:
+                yield prefix + child_path, sizes[child_path], 'file'
 
-        yield path, directories, files
 
-        for directory in directories:
-            for tup in self.walk(directory, refresh=refresh):
-                yield tup
+def _walk_concurrently(top, list_directory, join, nthreads):
+    """
+    Directory tree generator like os.walk, visiting directories breadth-first
+    and calling list_directory from a pool of nthreads threads so that the
+    listings of up to nthreads directories overlap. list_directory(path)
+    returns a (directories, files, ...) tuple, starting with the names in
+    path, or None to skip it. (root,) + that tuple is yielded. Like os.walk,
+    the caller may prune the traversal by removing names from the yielded
+    directories
+    """
+    executor = futures.ThreadPoolExecutor(max_workers=nthreads)
+    unvisited = collections.deque([top])
+    pending = collections.deque()
+
+    def _prefetch():
+        while unvisited and len(pending) < nthreads:
+            directory = unvisited.popleft()
+            future = executor.submit(list_directory, directory)
+            pending.append((directory, future))
+
+    try:
+        _prefetch()
+        while pending:
+            root, future = pending.popleft()
+            _prefetch()
+            listing = future.result()
+            if listing is None:
+                continue
+            yield (root,) + listing
+
+            # The yielded directories may have been pruned, only queue them
+            # now
+            unvisited.extend(join(root, directory)
+                             for directory in listing[0])
+            _prefetch()
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def _map_concurrently(func, args, executor=None):
+    """
+    Return [func(arg) for arg in args], calling func from a thread pool if
+    there are more than _STAT_MANY_SERIAL_THRESHOLD args. Meant for functions
+    dominated by the latency of a remote service. The pool is created for the
+    call unless an executor is passed
+    """
+    if len(args) <= _STAT_MANY_SERIAL_THRESHOLD:
+        return [func(arg) for arg in args]
+
+    if executor is not None:
+        return list(executor.map(func, args))
+
+    nthreads = min(len(args), _STAT_MANY_NTHREADS)
+    with futures.ThreadPoolExecutor(max_workers=nthreads) as executor:
+        return list(executor.map(func, args))
+
+
+def _s3_walk_files_dirs(top_path, contents):
+    # Returns the sorted directory and file names in the listing of top_path,
+    # and a dict mapping the file names to their size
+    directories = set()
+    files = {}
+
+    for key in contents:
+        path = key['Key']
+        if key['StorageClass'] == 'DIRECTORY':
+            directories.add(path)
+        elif key['StorageClass'] == 'BUCKET':
+            pass
+        else:
+            files[path] = key['Size']
+
+    # s3fs creates duplicate 'DIRECTORY' entries
+    for path in directories:
+        files.pop(path, None)
+
+    # All listed keys share the top_path + '/' prefix, strip it to get the
+    # basenames
+    prefix_len = len(top_path) + (0 if top_path.endswith('/') else 1)
+    sizes = dict((f[prefix_len:], size) for f, size in files.items())
+    files = sorted(sizes)
+    directories = sorted([x[prefix_len:] for x in directories])
+
+    return directories, files, sizes
+
+
+class _S3WriteFile(object):
+    """
+    Proxy for a file opened for writing by S3FSWrapper.open, calling
+    on_close once the underlying file has been closed
+    """
+
+    def __init__(self, handle, on_close):
+        self._handle = handle
+        self._on_close = on_close
+
+    def __getattr__(self, name):
+        return getattr(self._handle, name)
+
+    def __iter__(self):
+        return iter(self._handle)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+        # return false since we want to propagate exceptions
+        return False
+
+    def close(self):
+        try:
+            self._handle.close()
+        finally:
+            self._on_close()
+
+
+def _s3_key_stat(path, key):
+    if key is None:
+        raise IOError('Path does not exist: {0}'.format(path))
+    elif key['StorageClass'] in ('DIRECTORY', 'BUCKET'):
+        return {'size': 0, 'kind': 'directory'}
+    else:
+        return {'size': key['Size'], 'kind': 'file'}
 
 
 def _sanitize_s3(path):
@@ -380,62 +880,105 @@ def _sanitize_s3(path):
         return path
 
 
-def _ensure_filesystem(fs):
-    fs_type = type(fs)
+# Maps the type of a filesystem passed by the user to the function wrapping it
+# into an arrow FileSystem, see _ensure_filesystem
+_FS_WRAPPER_CACHE = {}
 
+
+def _get_filesystem_wrapper(fs_type):
     # If the arrow filesystem was subclassed, assume it supports the full
     # interface and return it
-    if not issubclass(fs_type, FileSystem):
-        for mro in inspect.getmro(fs_type):
-            if mro.__name__ == 'S3FileSystem':
-                return S3FSWrapper(fs)
-            # In case its a simple LocalFileSystem (e.g. dask) use native arrow
-            # FS
-            elif mro.__name__ == 'LocalFileSystem':
-                return LocalFileSystem.get_instance()
-
-        raise IOError('Unrecognized filesystem: {0}'.format(fs_type))
-    else:
-        return fs
+    if issubclass(fs_type, FileSystem):
+        return lambda fs: fs
+
+    for mro in inspect.getmro(fs_type):
+        if mro.__name__ == 'S3FileSystem':
+            return S3FSWrapper
+        # In case its a simple LocalFileSystem (e.g. dask) use native arrow
+        # FS
+        elif mro.__name__ == 'LocalFileSystem':
+            return lambda fs: _LOCAL_FS
+
+    raise IOError('Unrecognized filesystem: {0}'.format(fs_type))
+
+
+def _ensure_filesystem(fs):
+    fs_type = type(fs)
+    try:
+        wrapper = _FS_WRAPPER_CACHE[fs_type]
+    except KeyError:
+        wrapper = _FS_WRAPPER_CACHE[fs_type] = _get_filesystem_wrapper(fs_type)
+    return wrapper(fs)
+
+
+# Splits hdfs://host:port/path (or viewfs://) into scheme, host, port and path
+# the way urlparse would, the netloc being optional
+_HDFS_URI_RE = re.compile(r'^(hdfs|viewfs):(?://([^:/?#]*)(?::([^/?#]*))?)?'
+                          r'([^?#]*)', re.IGNORECASE)
+
+# HDFS connections opened by resolve_filesystem_and_path, by
+# (process id, host, port)
+_HDFS_CONNECTIONS = {}
+
+
+def _connect_hdfs(host, port):
+    # Connecting goes through a JNI handshake with the namenode, reuse the
+    # connection as long as it was not closed. The JVM backing libhdfs does
+    # not survive a fork, so forked processes open their own connection
+    key = (os.getpid(), host, port)
+    fs = _HDFS_CONNECTIONS.get(key)
+    if fs is None or not fs.is_open:
+        fs = _HDFS_CONNECTIONS[key] = pa.hdfs.connect(host=host, port=port)
+    return fs
 
 
 def resolve_filesystem_and_path(where, filesystem=None):
     """
     Return filesystem from path which could be an HDFS URI, a local URI,
     or a plain filesystem path.
+
+    HDFS connections are shared by all resolutions of the same host and port
+    within a process, so the returned filesystem should not be closed by the
+    caller.
     """
-    if not _is_path_like(where):
+    if type(where) is str:
+        # The common case, no conversion needed
+        path = where
+    elif not _is_path_like(where):
         if filesystem is not None:
             raise ValueError("filesystem passed but where is file-like, so"
                              " there is nothing to open with filesystem.")
         return filesystem, where
-
-    path = _stringify_path(where)
+    else:
+        path = _stringify_path(where)
 
     if filesystem is not None:
         return _ensure_filesystem(filesystem), path
 
-    parsed_uri = urlparse(path)
-    if parsed_uri.scheme == 'hdfs' or parsed_uri.scheme == 'viewfs':
+    if path.startswith('/') or ':' not in path:
+        # Input is local path such as /home/user/myfile.parquet, which cannot
+        # have an URI scheme so there is no need to parse it
+        return _LOCAL_FS, where
+
+    hdfs_match = _HDFS_URI_RE.match(path)
+    if hdfs_match is not None:
         # Input is hdfs URI such as hdfs://host:port/myfile.parquet
-        netloc_split = parsed_uri.netloc.split(':')
-        host = netloc_split[0]
-        if host == '':
+        scheme, host, port, fs_path = hdfs_match.groups()
+        if not host:
             host = 'default'
         else:
-            host = parsed_uri.scheme + "://" + host
-        port = 0
-        if len(netloc_split) == 2 and netloc_split[1].isnumeric():
-            port = int(netloc_split[1])
-        fs = pa.hdfs.connect(host=host, port=port)
-        fs_path = parsed_uri.path
-    elif parsed_uri.scheme == 'file':
+            host = scheme.lower() + "://" + host
+        port = int(port) if port and port.isdigit() else 0
+        return _connect_hdfs(host, port), fs_path
+
+    parsed_uri = urlparse(path)
+    if parsed_uri.scheme == 'file':
         # Input is local URI such as file:///home/user/myfile.parquet
-        fs = LocalFileSystem.get_instance()
+        fs = _LOCAL_FS
         fs_path = parsed_uri.path
     else:
-        # Input is local path such as /home/user/myfile.parquet
-        fs = LocalFileSystem.get_instance()
+        # Input is local path such as C:/Windows/myfile.parquet
+        fs = _LOCAL_FS
         fs_path = where
 
     return fs, fs_path
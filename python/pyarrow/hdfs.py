@@ -18,7 +18,6 @@
 from __future__ import absolute_import
 
 import os
-import posixpath
 import sys
 
 from pyarrow.util import implements
@@ -169,7 +168,7 @@ def _libhdfs_walk_files_dirs(top_path, contents):
     files = []
     directories = []
     for c in contents:
-        scrubbed_name = posixpath.split(c['name'])[1]
+        scrubbed_name = c['name'].rpartition('/')[2]
         if c['kind'] == 'file':
             files.append(scrubbed_name)
         else:
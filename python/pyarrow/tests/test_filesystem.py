@@ -15,6 +15,11 @@
 # specific language governing permissions and limitations
 # under the License.
 
+import io
+import os
+
+import pytest
+
 from pyarrow import filesystem
 
 
@@ -35,3 +40,522 @@ def test_resolve_local_path():
         fs, path = filesystem.resolve_filesystem_and_path(uri)
         assert isinstance(fs, filesystem.LocalFileSystem)
         assert path == uri
+
+
+def test_local_disk_usage(tmpdir):
+    fs = filesystem.LocalFileSystem.get_instance()
+    data = b'foobarbaz'
+
+    base = tmpdir.mkdir('disk-usage-base')
+    subdir = base.mkdir('subdir')
+    for file_path in [base.join('p1'), base.join('p2'), subdir.join('p3')]:
+        file_path.write(data, mode='wb')
+
+    assert fs.disk_usage(str(base)) == len(data) * 3
+    assert fs.disk_usage(str(subdir)) == len(data)
+    assert fs.disk_usage(str(subdir.join('p3'))) == len(data)
+
+
+class MockS3FileSystem(object):
+    """
+    Minimal stand-in for s3fs.S3FileSystem serving listings from a fixed set
+    of object keys
+    """
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.ls_calls = []
+
+    def _ls(self, path, refresh=False):
+        self.ls_calls.append(path)
+        prefix = path.rstrip('/') + '/'
+        contents = {}
+        for key in self.keys:
+            if not key.startswith(prefix):
+                continue
+            child, sep, _ = key[len(prefix):].partition('/')
+            if sep:
+                contents[prefix + child] = 'DIRECTORY'
+            else:
+                contents[prefix + child] = 'STANDARD'
+        return [{'Key': key, 'StorageClass': storage_class, 'Size': 3}
+                for key, storage_class in sorted(contents.items())]
+
+    def rm(self, path, recursive=False):
+        self.keys = [key for key in self.keys
+                     if key != path and not key.startswith(path + '/')]
+
+    def open(self, path, mode='rb'):
+        if 'w' not in mode:
+            return io.BytesIO()
+
+        # Like on S3, the key only exists once the file is closed
+        mock_fs = self
+
+        class MockS3File(io.BytesIO):
+            def close(self):
+                if not self.closed:
+                    mock_fs.keys = mock_fs.keys + [path.replace('s3://', '')]
+                super(MockS3File, self).close()
+
+        return MockS3File()
+
+
+S3_KEYS = ['bucket/base/a.parquet',
+           'bucket/base/foo=0/b.parquet',
+           'bucket/base/foo=1/bar=x/c.parquet',
+           'bucket/base/foo=1/bar=y/d.parquet']
+
+
+def test_s3fs_wrapper_walk():
+    fs = filesystem.S3FSWrapper(MockS3FileSystem(S3_KEYS))
+
+    result = list(fs.walk('s3://bucket/base'))
+    assert result == [
+        ('bucket/base', ['foo=0', 'foo=1'], ['a.parquet']),
+        ('bucket/base/foo=0', [], ['b.parquet']),
+        ('bucket/base/foo=1', ['bar=x', 'bar=y'], []),
+        ('bucket/base/foo=1/bar=x', [], ['c.parquet']),
+        ('bucket/base/foo=1/bar=y', [], ['d.parquet']),
+    ]
+
+
+def test_s3fs_wrapper_isdir_isfile_cached():
+    mock_fs = MockS3FileSystem(S3_KEYS)
+    fs = filesystem.S3FSWrapper(mock_fs)
+
+    assert fs.isdir('s3://bucket/base')
+    assert fs.isdir('bucket/base/foo=1')
+    assert not fs.isfile('bucket/base/foo=1')
+    assert fs.isfile('bucket/base/a.parquet')
+    assert not fs.isdir('bucket/base/a.parquet')
+
+    # Only the parent prefixes were listed, once each
+    assert sorted(mock_fs.ls_calls) == ['bucket', 'bucket/base']
+
+    fs.delete('bucket/base/a.parquet')
+    assert not fs.isfile('bucket/base/a.parquet')
+
+    del mock_fs.ls_calls[:]
+    list(fs.walk('bucket/base', refresh=True))
+    assert 'bucket/base' in mock_fs.ls_calls
+
+
+def test_ensure_filesystem():
+    class LocalFileSystem(object):
+        pass
+
+    class S3FileSystem(object):
+        pass
+
+    class CustomFS(filesystem.FileSystem):
+        pass
+
+    for _ in range(2):
+        local_fs = filesystem._ensure_filesystem(LocalFileSystem())
+        assert local_fs is filesystem.LocalFileSystem.get_instance()
+
+        s3_fs = S3FileSystem()
+        wrapper = filesystem._ensure_filesystem(s3_fs)
+        assert isinstance(wrapper, filesystem.S3FSWrapper)
+        assert wrapper.fs is s3_fs
+
+        custom_fs = CustomFS()
+        assert filesystem._ensure_filesystem(custom_fs) is custom_fs
+
+        with pytest.raises(IOError):
+            filesystem._ensure_filesystem(object())
+
+
+def test_s3fs_wrapper_walk_lists_full_prefixes():
+    mock_fs = MockS3FileSystem(S3_KEYS)
+    fs = filesystem.S3FSWrapper(mock_fs)
+
+    roots = [root for root, _, _ in fs.walk('bucket/base/')]
+    assert roots == ['bucket/base', 'bucket/base/foo=0', 'bucket/base/foo=1',
+                     'bucket/base/foo=1/bar=x', 'bucket/base/foo=1/bar=y']
+
+    # A single listing per directory, always by its full prefix
+    assert sorted(mock_fs.ls_calls) == roots
+
+
+class DictFileSystem(filesystem.FileSystem):
+    """
+    FileSystem over a dict mapping directory paths to their file sizes
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+
+    def stat(self, path):
+        if path in self.tree:
+            return {'size': 0, 'kind': 'directory'}
+        root, _, name = path.rpartition('/')
+        return {'size': self.tree[root][name], 'kind': 'file'}
+
+    def walk(self, path):
+        for root in sorted(self.tree):
+            if root == path or root.startswith(path + '/'):
+                yield root, [], sorted(self.tree[root])
+
+
+@pytest.mark.parametrize('nfiles', [0, 3, 100])
+def test_disk_usage(nfiles):
+    files = {'f{0}'.format(i): i for i in range(nfiles)}
+    fs = DictFileSystem({'/base': files, '/base/sub': {'f': 7}})
+
+    assert fs.disk_usage('/base') == sum(files.values()) + 7
+    assert fs.disk_usage('/base/sub/f') == 7
+
+
+def test_disk_usage_reuses_executor(monkeypatch):
+    executors = []
+    executor_class = filesystem.futures.ThreadPoolExecutor
+
+    def make_executor(*args, **kwargs):
+        executors.append(executor_class(*args, **kwargs))
+        return executors[-1]
+
+    monkeypatch.setattr(filesystem.futures, 'ThreadPoolExecutor',
+                        make_executor)
+
+    nfiles = 3 * filesystem._DISK_USAGE_CHUNK_SIZE + 1
+    files = {'f{0}'.format(i): i for i in range(nfiles)}
+    fs = DictFileSystem({'/base': files})
+
+    assert fs.disk_usage('/base') == sum(files.values())
+    # A single pool serves all the stat_many chunks
+    assert len(executors) == 1
+
+
+@pytest.mark.parametrize('use_scandir', [True, False])
+def test_local_filesystem_path_like(tmpdir, monkeypatch, use_scandir):
+    if not use_scandir:
+        monkeypatch.setattr(filesystem, '_scandir', None)
+    pathlib = pytest.importorskip('pathlib')
+    fs = filesystem.LocalFileSystem.get_instance()
+
+    base = pathlib.Path(str(tmpdir))
+    fs.mkdir(base / 'subdir')
+    with fs.open(base / 'a-file', 'wb') as f:
+        f.write(b'foo')
+
+    assert fs.exists(base / 'a-file')
+    assert fs.isfile(base / 'a-file')
+    assert fs.isdir(base / 'subdir')
+    assert fs.ls(base) == [str(base / 'a-file'), str(base / 'subdir')]
+    assert fs.disk_usage(base) == 3
+    assert [root for root, _, _ in fs.walk(base)] == [str(base),
+                                                      str(base / 'subdir')]
+
+
+def test_s3fs_wrapper_stat_and_disk_usage():
+    mock_fs = MockS3FileSystem(S3_KEYS)
+    fs = filesystem.S3FSWrapper(mock_fs)
+
+    assert fs.stat('s3://bucket/base/a.parquet') == {'size': 3, 'kind': 'file'}
+    assert fs.stat('bucket/base/foo=1') == {'size': 0, 'kind': 'directory'}
+    assert fs.stat_many(['bucket/base/foo=0/b.parquet',
+                         'bucket/base/a.parquet']) == [
+        {'size': 3, 'kind': 'file'}, {'size': 3, 'kind': 'file'}
+    ]
+    with pytest.raises(IOError):
+        fs.stat('bucket/base/missing')
+
+    del mock_fs.ls_calls[:]
+    assert fs.disk_usage('bucket/base') == 3 * len(S3_KEYS)
+    # Sizes come from the listings cached by walk, the remaining prefixes
+    # were already listed above
+    assert sorted(mock_fs.ls_calls) == ['bucket', 'bucket/base/foo=1',
+                                        'bucket/base/foo=1/bar=x',
+                                        'bucket/base/foo=1/bar=y']
+
+
+def test_s3fs_wrapper_stat_bucket():
+    # The mock lists no buckets at the root, as s3fs does for anonymous
+    # access or without the s3:ListAllMyBuckets permission
+    mock_fs = MockS3FileSystem(S3_KEYS)
+    fs = filesystem.S3FSWrapper(mock_fs)
+
+    assert fs.stat('s3://bucket') == {'size': 0, 'kind': 'directory'}
+    assert fs.disk_usage('s3://bucket') == 3 * len(S3_KEYS)
+    assert '' not in mock_fs.ls_calls
+
+
+@pytest.mark.parametrize('parallel', [False, True])
+def test_local_walk(tmpdir, parallel):
+    fs = filesystem.LocalFileSystem.get_instance()
+
+    base = tmpdir.mkdir('walk-base')
+    base.mkdir('foo=0').join('a.parquet').write('')
+    base.mkdir('foo=1').join('b.parquet').write('')
+    base.join('_metadata').write('')
+
+    expected = sorted(os.walk(str(base)))
+    assert sorted(fs.walk(str(base), parallel=parallel)) == expected
+
+    # Pruning directories stops the traversal, like os.walk
+    for root, directories, files in fs.walk(str(base), parallel=parallel):
+        assert root == str(base)
+        del directories[:]
+
+    if hasattr(os, 'symlink'):
+        link = tmpdir.join('walk-link')
+        os.symlink(str(base), str(link))
+        assert (sorted(fs.walk(str(link), parallel=parallel)) ==
+                sorted(os.walk(str(link))))
+
+        # Symlinks to directories are listed but not descended into
+        os.symlink(str(base.join('foo=0')), str(base.join('foo=2')))
+        assert (sorted(fs.walk(str(base), parallel=parallel)) ==
+                sorted(os.walk(str(base))))
+
+
+@pytest.mark.parametrize('use_scandir', [True, False])
+def test_local_walk_stat(tmpdir, monkeypatch, use_scandir):
+    if not use_scandir:
+        monkeypatch.setattr(filesystem, '_scandir', None)
+    fs = filesystem.LocalFileSystem.get_instance()
+
+    base = tmpdir.mkdir('walk-stat-base')
+    subdir = base.mkdir('subdir')
+    base.join('p1').write(b'foo', mode='wb')
+    subdir.join('p2').write(b'foobar', mode='wb')
+
+    assert sorted(fs.walk_stat(str(base))) == [
+        (str(base.join('p1')), 3, 'file'),
+        (str(subdir), 0, 'directory'),
+        (str(subdir.join('p2')), 6, 'file'),
+    ]
+
+
+def test_s3fs_wrapper_walk_stat():
+    mock_fs = MockS3FileSystem(S3_KEYS)
+    fs = filesystem.S3FSWrapper(mock_fs)
+
+    result = sorted(fs.walk_stat('bucket/base'))
+    assert result == sorted(
+        [(key, 3, 'file') for key in S3_KEYS] +
+        [('bucket/base/foo=0', 0, 'directory'),
+         ('bucket/base/foo=1', 0, 'directory'),
+         ('bucket/base/foo=1/bar=x', 0, 'directory'),
+         ('bucket/base/foo=1/bar=y', 0, 'directory')])
+    # One listing per directory and no stat call
+    assert len(mock_fs.ls_calls) == 5
+
+
+def test_resolve_hdfs_uri(monkeypatch):
+    connections = []
+
+    class MockHadoopFileSystem(object):
+        def __init__(self, host, port):
+            self.host = host
+            self.port = port
+            self.is_open = True
+            connections.append(self)
+
+    monkeypatch.setattr(filesystem, '_HDFS_CONNECTIONS', {})
+    monkeypatch.setattr('pyarrow.hdfs.connect', MockHadoopFileSystem)
+
+    for uri, host, port, expected_path in [
+            ('hdfs://namenode:8020/data/x.parquet', 'hdfs://namenode', 8020,
+             '/data/x.parquet'),
+            ('hdfs://namenode/data/x.parquet', 'hdfs://namenode', 0,
+             '/data/x.parquet'),
+            ('hdfs:///data/x.parquet', 'default', 0, '/data/x.parquet'),
+            ('viewfs://cluster:80/x.parquet?a=b', 'viewfs://cluster', 80,
+             '/x.parquet')]:
+        fs, path = filesystem.resolve_filesystem_and_path(uri)
+        assert (fs.host, fs.port) == (host, port)
+        assert path == expected_path
+
+    # Connections are reused until closed
+    fs, _ = filesystem.resolve_filesystem_and_path('hdfs:///other.parquet')
+    assert fs is connections[2]
+    fs.is_open = False
+    fs, _ = filesystem.resolve_filesystem_and_path('hdfs:///other.parquet')
+    assert fs is connections[-1]
+    assert len(connections) == 5
+
+    # A forked process does not reuse the connections of its parent
+    pid = os.getpid()
+    monkeypatch.setattr(os, 'getpid', lambda: pid + 1)
+    fs, _ = filesystem.resolve_filesystem_and_path('hdfs:///other.parquet')
+    assert fs is connections[-1]
+    assert len(connections) == 6
+    fs, _ = filesystem.resolve_filesystem_and_path('hdfs:///other.parquet')
+    assert len(connections) == 6
+
+
+def test_resolve_path_like_and_file_like(tmpdir):
+    pathlib = pytest.importorskip('pathlib')
+    path = pathlib.Path(str(tmpdir)) / 'myfile.parquet'
+    fs, resolved = filesystem.resolve_filesystem_and_path(path)
+    assert isinstance(fs, filesystem.LocalFileSystem)
+    assert resolved is path
+
+    sink = object()
+    assert filesystem.resolve_filesystem_and_path(sink) == (None, sink)
+    with pytest.raises(ValueError):
+        filesystem.resolve_filesystem_and_path(sink, fs)
+
+
+def test_filesystem_pickle():
+    import pickle
+
+    local_fs = filesystem.LocalFileSystem.get_instance()
+    assert local_fs is filesystem.LocalFileSystem.get_instance()
+
+    s3_fs = filesystem.S3FSWrapper(MockS3FileSystem(S3_KEYS))
+    assert s3_fs.isdir('bucket/base')
+
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        result = pickle.loads(pickle.dumps(local_fs, protocol=protocol))
+        assert isinstance(result, filesystem.LocalFileSystem)
+
+        result = pickle.loads(pickle.dumps(s3_fs, protocol=protocol))
+        assert isinstance(result, filesystem.S3FSWrapper)
+        assert result.fs.keys == S3_KEYS
+        assert result._listing_cache == {}
+
+
+class ExtendedS3FSWrapper(filesystem.S3FSWrapper):
+
+    def __init__(self, fs, anon):
+        super(ExtendedS3FSWrapper, self).__init__(fs)
+        self.anon = anon
+
+
+def test_dask_filesystem_subclass_pickle():
+    import pickle
+
+    fs = ExtendedS3FSWrapper(MockS3FileSystem(S3_KEYS), anon=True)
+    fs.region = 'us-east-1'
+    assert fs.isdir('bucket/base')
+
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        result = pickle.loads(pickle.dumps(fs, protocol=protocol))
+        assert isinstance(result, ExtendedS3FSWrapper)
+        assert result.fs.keys == S3_KEYS
+        assert result.anon is True
+        assert result.region == 'us-east-1'
+        assert result._listing_cache == {}
+
+
+def test_s3fs_wrapper_walk_prune():
+    mock_fs = MockS3FileSystem(S3_KEYS)
+    fs = filesystem.S3FSWrapper(mock_fs)
+
+    roots = []
+    for root, directories, files in fs.walk('bucket/base'):
+        roots.append(root)
+        directories[:] = [x for x in directories if x != 'foo=1']
+    assert roots == ['bucket/base', 'bucket/base/foo=0']
+    assert sorted(mock_fs.ls_calls) == roots
+
+    # Only looking at the top level lists nothing else
+    del mock_fs.ls_calls[:]
+    root, _, _ = next(fs.walk('bucket/base/foo=1', refresh=True))
+    assert root == 'bucket/base/foo=1'
+    assert mock_fs.ls_calls == ['bucket/base/foo=1']
+
+
+def test_local_walk_stat_skips_unlistable_directories(tmpdir, monkeypatch):
+    fs = filesystem.LocalFileSystem.get_instance()
+
+    base = tmpdir.mkdir('walk-stat-errors')
+    base.join('p1').write(b'foo', mode='wb')
+    base.mkdir('subdir').join('p2').write(b'foobar', mode='wb')
+
+    scandir = filesystem._scandir
+    if scandir is None:
+        pytest.skip('os.scandir is not available')
+
+    def failing_scandir(path):
+        if path == str(base.join('subdir')):
+            raise OSError('Permission denied')
+        return scandir(path)
+
+    monkeypatch.setattr(filesystem, '_scandir', failing_scandir)
+    assert fs.disk_usage(str(base)) == 3
+    with pytest.raises(OSError):
+        list(fs.walk_stat(str(base.join('subdir'))))
+
+
+def test_local_walk_stat_entry_type_errors(tmpdir, monkeypatch):
+    fs = filesystem.LocalFileSystem.get_instance()
+
+    base = tmpdir.mkdir('walk-stat-entry-errors')
+    base.join('p1').write(b'foo', mode='wb')
+    base.join('p2').write(b'foobar', mode='wb')
+
+    scandir = filesystem._scandir
+    if scandir is None:
+        pytest.skip('os.scandir is not available')
+
+    class FailingEntry(object):
+        def __init__(self, entry):
+            self._entry = entry
+
+        def __getattr__(self, name):
+            return getattr(self._entry, name)
+
+        def is_dir(self):
+            if self._entry.name == 'p2':
+                raise OSError('Permission denied')
+            return self._entry.is_dir()
+
+    monkeypatch.setattr(filesystem, '_scandir',
+                        lambda path: [FailingEntry(e) for e in scandir(path)])
+    assert sorted(fs.walk_stat(str(base))) == [
+        (str(base.join('p1')), 3, 'file'),
+        (str(base.join('p2')), 6, 'file')
+    ]
+
+
+def test_s3fs_wrapper_walk_stat_single_listing(monkeypatch):
+    # Sizes must come from the listing the walk used, even if the cached
+    # listing expired and the bucket changed in the meantime
+    monkeypatch.setattr(filesystem, '_S3_LISTING_TTL', 0)
+
+    class ChangingS3FileSystem(MockS3FileSystem):
+        def _ls(self, path, refresh=False):
+            contents = super(ChangingS3FileSystem, self)._ls(path, refresh)
+            self.rm('bucket/base/a.parquet')
+            return contents
+
+    mock_fs = ChangingS3FileSystem(S3_KEYS)
+    fs = filesystem.S3FSWrapper(mock_fs)
+
+    result = list(fs.walk_stat('bucket/base'))
+    assert ('bucket/base/a.parquet', 3, 'file') in result
+    assert len(mock_fs.ls_calls) == 5
+
+
+def test_s3fs_wrapper_isfile_lists_parent_once():
+    keys = ['bucket/base/f{0}.parquet'.format(i) for i in range(20)]
+    mock_fs = MockS3FileSystem(keys)
+    fs = filesystem.S3FSWrapper(mock_fs)
+
+    assert all(fs.isfile(key) for key in keys)
+    assert mock_fs.ls_calls == ['bucket/base']
+
+
+def test_s3fs_wrapper_open_for_writing_invalidates_listings():
+    fs = filesystem.S3FSWrapper(MockS3FileSystem(S3_KEYS))
+    new_key = 'bucket/base/foo=0/new.parquet'
+
+    assert not fs.isfile(new_key)
+    list(fs.walk('bucket/base'))
+    with fs.open('s3://' + new_key, 'rb'):
+        pass
+    assert not fs.isfile(new_key)
+
+    with fs.open('s3://' + new_key, 'wb') as f:
+        f.write(b'foo')
+        # Listings cached before the object exists are dropped on close
+        assert not fs.isfile(new_key)
+        list(fs.walk('bucket/base'))
+    assert fs.isfile(new_key)
+    walked = [(root, files) for root, _, files in fs.walk('bucket/base')]
+    assert ('bucket/base/foo=0', ['b.parquet', 'new.parquet']) in walked